@@ -1,41 +1,264 @@
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+import urllib3
+import urllib3.util.request
+from urllib3.util.retry import Retry
+import lxml.html
+from lxml import etree
 import urllib.parse
 import os
+import re
+import shutil
+import sys
+import shelve
+import threading
 import logging
+import logging.handlers
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Debug logging (and a log file for every run) is opt-in via NEPJOL_DEBUG=1
+DEBUG_ENABLED = os.environ.get('NEPJOL_DEBUG') == '1'
+
+class LazyFileHandler(logging.FileHandler):
+    """File handler that only creates its directory and file when the first record is written"""
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding, delay=True)
+    
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+    
+    @property
+    def opened(self):
+        return self.stream is not None
+
 # Set up logging configuration
 def setup_logging():
     """Configure logging to file and console"""
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
+    # Without debug only warnings and above reach the file, so quiet runs leave no log behind
+    file_level = logging.DEBUG if DEBUG_ENABLED else logging.WARNING
     
     # Create a timestamp for the log filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_filename = f"logs/nepjol_search_{timestamp}.log"
     
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    
+    # Buffer file records in memory and write them out in batches
+    file_handler = LazyFileHandler(log_filename, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(log_format))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    buffered_handler.setLevel(file_level)
+    atexit.register(buffered_handler.flush)
+    
     # Configure logging
     logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        level=logging.DEBUG if DEBUG_ENABLED else logging.INFO,
+        format=log_format,
         handlers=[
-            logging.FileHandler(log_filename, encoding='utf-8'),
+            buffered_handler,
             logging.StreamHandler()
         ]
     )
     
-    return log_filename
+    return buffered_handler
 
-# Initialize logging
-log_filename = setup_logging()
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.nepjol.info"
+SEARCH_URL = f"{BASE_URL}/index.php/index/search/index"
+
+# One adapter shared by both sessions, so every request reuses the same pool
+# of keep-alive connections
+HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+HEADERS = {
+    "User-Agent": "nepjol-article-fetcher/1.0 (+https://github.com/Rubinot/nepjol_article_fetcher)",
+    # urllib3 lists only the encodings it can decode here; br is added when
+    # brotli (or brotlicffi) is installed
+    "Accept-Encoding": urllib3.util.request.ACCEPT_ENCODING
+}
+
+# Page session, caching responses on disk for an hour so repeated lookups skip
+# the network. Like the ETag store it is created on first use, so importing the
+# module leaves no cache file behind.
+SESSION = None
+SESSION_LOCK = threading.Lock()
+
+def open_session():
+    """Returns the cached page session, creating it and purging expired entries on first use"""
+    global SESSION
+    with SESSION_LOCK:
+        if SESSION is None:
+            session = requests_cache.CachedSession(
+                'nepjol_cache',
+                backend='sqlite',
+                expire_after=3600,
+                allowable_methods=('GET',),
+                stale_if_error=True
+            )
+            session.cache.delete(expired=True)
+            session.mount("https://", HTTP_ADAPTER)
+            session.headers.update(HEADERS)
+            SESSION = session
+    return SESSION
+
+# PDFs bypass the cache entirely: a cached session would read every download
+# into memory and store it in SQLite.
+DOWNLOAD_SESSION = requests.Session()
+DOWNLOAD_SESSION.mount("https://", HTTP_ADAPTER)
+DOWNLOAD_SESSION.headers.update(HEADERS)
+
+def warm_up_connection():
+    """
+    Opens a pooled connection to NepJol in the background (DNS, TCP and TLS),
+    so the first real request can reuse it instead of paying the setup cost.
+    Returns the started thread.
+    """
+    def probe():
+        # Look the pool up the way HTTPAdapter.send does (same TLS settings and
+        # proxies), so the search finds this connection. The request itself is a
+        # single attempt: the adapter's retry policy would log warnings to the
+        # console while the user is typing.
+        request = DOWNLOAD_SESSION.prepare_request(requests.Request("HEAD", f"{BASE_URL}/"))
+        settings = DOWNLOAD_SESSION.merge_environment_settings(request.url, {}, None, None, None)
+        adapter = DOWNLOAD_SESSION.get_adapter(request.url)
+        try:
+            pool = adapter.get_connection_with_tls_context(
+                request, settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+            )
+            adapter.cert_verify(pool, request.url, settings["verify"], settings["cert"])
+            pool.urlopen(
+                "HEAD",
+                adapter.request_url(request, settings["proxies"]),
+                headers=request.headers,
+                redirect=False,
+                assert_same_host=False,
+                retries=False,
+                timeout=5
+            )
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            logger.debug(f"Connection warm-up failed: {e}")
+    
+    thread = threading.Thread(target=probe, daemon=True)
+    thread.start()
+    return thread
+
+# Links extracted from article and viewer pages, keyed by page URL together
+# with the page's ETag, so unchanged pages can be revalidated with a 304.
+# The store is opened on first use; False marks it as unavailable.
+ETAG_CACHE = None
+ETAG_LOCK = threading.Lock()
+
+def open_etag_cache():
+    """
+    Returns the ETag store, opening it on first use, or None when it cannot be
+    opened (e.g. locked by another running copy). Call with ETAG_LOCK held.
+    """
+    global ETAG_CACHE
+    if ETAG_CACHE is None:
+        try:
+            ETAG_CACHE = shelve.open('etag_cache')
+            atexit.register(ETAG_CACHE.close)
+        except Exception as e:
+            logger.warning(f"ETag cache unavailable, pages will not be revalidated: {e}")
+            ETAG_CACHE = False
+    return ETAG_CACHE if ETAG_CACHE is not False else None
+
+# Upper bound on simultaneous requests when resolving many articles at once
+MAX_CONCURRENCY = 10
+
+# Characters that are dropped when turning text into a file name
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w .\-]+')
+
+# Content-Type values that identify a PDF download
+PDF_CONTENT_TYPE = re.compile(r'application/pdf\b', re.IGNORECASE)
+
+# Block size used when streaming PDF downloads to disk
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# NepJol (OJS) serves UTF-8 pages; decoding is left to lxml
+HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+def has_class(*classes):
+    """Builds an XPath predicate matching elements that carry all given CSS classes"""
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')" for css_class in classes
+    )
+
+def element_text(element):
+    """Returns the text of an element with whitespace collapsed"""
+    return " ".join("".join(element.itertext()).split())
+
+# XPath queries are compiled once and reused for every page and result block
+SUMMARY_XPATH = etree.XPath(f"//div[{has_class('obj_article_summary')}]")
+TITLE_LINK_XPATH = etree.XPath("(.//a)[1]")
+AUTHORS_XPATH = etree.XPath(f"(.//div[{has_class('authors')}])[1]")
+SOURCE_XPATH = etree.XPath(f"(.//div[{has_class('source')}])[1]")
+PDF_VIEWER_LINK_XPATH = etree.XPath(f"//a[{has_class('obj_galley_link', 'pdf')}]/@href")
+DOWNLOAD_LINK_XPATH = etree.XPath(f"//a[{has_class('download')}]/@href")
+
+def parse_search_results(results):
+    """Extracts title, authors, link and source from each result block"""
+    # Collect per-result debug details and log them once after the loop
+    debug_on = logger.isEnabledFor(logging.DEBUG)
+    parsed_titles = [] if debug_on else None
+    converted_links = 0
+    found = 0
+
+    parsed_results = []
+    for i, result in enumerate(results, 1):
+        found = i
+        try:
+            link_tags = TITLE_LINK_XPATH(result)
+            title = element_text(link_tags[0]) if link_tags else "No title"
+            link = link_tags[0].get("href", "No link") if link_tags else "No link"
+            
+            if link.startswith("/"):
+                link = BASE_URL + link
+                converted_links += 1
+
+            author_tags = AUTHORS_XPATH(result)
+            authors = element_text(author_tags[0]) if author_tags else "No authors"
+
+            source_tags = SOURCE_XPATH(result)
+            source = element_text(source_tags[0]) if source_tags else "Unknown source"
+
+            parsed_results.append({
+                "title": title,
+                "authors": authors,
+                "link": link,
+                "source": source
+            })
+            
+            if debug_on:
+                parsed_titles.append(f"{i}: {title[:50]}")
+            
+        except Exception as e:
+            logger.error(f"Error parsing result {i}: {e}")
+            continue
+
+    logger.info(f"Found {found} result elements")
+
+    if debug_on and parsed_results:
+        logger.debug("Parsed results: %s", "; ".join(parsed_titles))
+        logger.debug("Converted %d relative URLs to absolute", converted_links)
+
+    return parsed_results
+
 def search_nepjol(query):
     logger.info(f"Starting search for query: '{query}'")
-    base_url = "https://www.nepjol.info/index.php/index/search/index"
-    
     params = {
         "query": query,
         "dateFromYear": "",
@@ -48,54 +271,22 @@ def search_nepjol(query):
     }
 
     try:
-        logger.debug(f"Making request to: {base_url}")
+        logger.debug(f"Making request to: {SEARCH_URL}")
         logger.debug(f"Request parameters: {params}")
         
-        response = requests.get(base_url, params=params, timeout=10)
+        response = open_session().get(SEARCH_URL, params=params, timeout=10)
         response.raise_for_status()
         
         logger.info(f"Request successful. Status code: {response.status_code}")
         logger.debug(f"Response URL: {response.url}")
         
-        soup = BeautifulSoup(response.text, "html.parser")
-        results = soup.find_all("div", class_="obj_article_summary")
-        
-        logger.info(f"Found {len(results)} result elements")
+        tree = lxml.html.fromstring(response.content, parser=HTML_PARSER)
+        parsed_results = parse_search_results(SUMMARY_XPATH(tree))
 
-        if not results:
+        if not parsed_results:
             logger.warning("No results found in the parsed HTML")
             return []
 
-        parsed_results = []
-        for i, result in enumerate(results, 1):
-            try:
-                link_tag = result.find("a")
-                title = link_tag.get_text(strip=True) if link_tag else "No title"
-                link = link_tag["href"] if link_tag and link_tag.has_attr("href") else "No link"
-                
-                if link.startswith("/"):
-                    link = "https://www.nepjol.info" + link
-                    logger.debug(f"Converted relative URL to absolute: {link}")
-
-                author_tag = result.find("div", class_="authors")
-                authors = author_tag.get_text(strip=True) if author_tag else "No authors"
-
-                source_tag = result.find("div", class_="source")
-                source = source_tag.get_text(strip=True) if source_tag else "Unknown source"
-
-                parsed_results.append({
-                    "title": title,
-                    "authors": authors,
-                    "link": link,
-                    "source": source
-                })
-                
-                logger.debug(f"Parsed result {i}: {title[:50]}...")
-                
-            except Exception as e:
-                logger.error(f"Error parsing result {i}: {e}")
-                continue
-
         logger.info(f"Successfully parsed {len(parsed_results)} results")
         return parsed_results
 
@@ -111,17 +302,27 @@ def display_results(results, query):
         logger.warning("No results to display")
         return
     
-    print(f"\n{'='*80}")
-    print(f"SEARCH RESULTS FOR: '{query.upper()}'")
-    print(f"Found {len(results)} results")
-    print(f"{'='*80}\n")
+    # Build the whole listing first and write it to stdout in one go
+    lines = [
+        f"\n{'='*80}\n",
+        f"SEARCH RESULTS FOR: '{query.upper()}'\n",
+        f"Found {len(results)} results\n",
+        f"{'='*80}\n\n"
+    ]
     
     for i, result in enumerate(results, 1):
-        print(f"{i}. {result['title']}")
-        print(f"   Authors: {result['authors']}")
-        print(f"   Source: {result['source']}")
-        print(f"   Link: {result['link']}")
-        print()
+        lines.append(
+            f"{i}. {result['title']}\n"
+            f"   Authors: {result['authors']}\n"
+            f"   Source: {result['source']}\n"
+            f"   Link: {result['link']}\n\n"
+        )
+    
+    sys.stdout.write("".join(lines))
+
+def safe_filename(text):
+    """Strips characters that are not letters, digits, spaces, dots, hyphens or underscores"""
+    return UNSAFE_FILENAME_CHARS.sub('', text).rstrip()
 
 def save_to_file(results, query, filename=None):
     logger.info(f"Saving results to file for query: '{query}'")
@@ -131,19 +332,25 @@ def save_to_file(results, query, filename=None):
         return
     
     if not filename:
-        safe_query = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_query = safe_filename(query)
         filename = f"nepjol_results_{safe_query}.txt"
     
     try:
+        lines = [
+            f"NepJol Search Results for: {query}\n",
+            f"{'='*60}\n\n"
+        ]
+        
+        for i, result in enumerate(results, 1):
+            lines.append(
+                f"{i}. {result['title']}\n"
+                f"   Authors: {result['authors']}\n"
+                f"   Source: {result['source']}\n"
+                f"   Link: {result['link']}\n\n"
+            )
+        
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"NepJol Search Results for: {query}\n")
-            f.write(f"{'='*60}\n\n")
-            
-            for i, result in enumerate(results, 1):
-                f.write(f"{i}. {result['title']}\n")
-                f.write(f"   Authors: {result['authors']}\n")
-                f.write(f"   Source: {result['source']}\n")
-                f.write(f"   Link: {result['link']}\n\n")
+            f.write("".join(lines))
         
         logger.info(f"Results successfully saved to: {filename}")
         print(f"Results saved to: {filename}")
@@ -152,6 +359,39 @@ def save_to_file(results, query, filename=None):
         logger.error(f"Error saving to file {filename}: {e}")
         print(f"Error saving file: {e}")
 
+def fetch_page_link(page_url, link_xpath):
+    """
+    Fetches a page and returns the absolute URL of the first link found by the
+    compiled link_xpath.
+    The result is stored with the page's ETag, so when the server answers a repeat
+    request with 304 Not Modified the stored link is returned without parsing.
+    """
+    with ETAG_LOCK:
+        etag_cache = open_etag_cache()
+        cached = etag_cache.get(page_url) if etag_cache is not None else None
+    
+    headers = {'If-None-Match': cached['etag']} if cached else {}
+    response = open_session().get(page_url, headers=headers, timeout=10)
+    
+    if response.status_code == 304 and cached:
+        logger.debug(f"Page not modified, reusing stored link for: {page_url}")
+        return cached['link']
+    
+    response.raise_for_status()
+    tree = lxml.html.fromstring(response.content, parser=HTML_PARSER)
+    links = link_xpath(tree)
+    
+    if not links:
+        return None
+    
+    link = urllib.parse.urljoin(page_url, links[0])
+    etag = response.headers.get('ETag')
+    if etag_cache is not None and etag and (not cached or cached['etag'] != etag or cached['link'] != link):
+        with ETAG_LOCK:
+            etag_cache[page_url] = {'etag': etag, 'link': link}
+    
+    return link
+
 def find_pdf_link(article_url):
     """
     Fetches an article's page and then the PDF viewer page to find the final download link.
@@ -159,31 +399,21 @@ def find_pdf_link(article_url):
     logger.info(f"Step 1: Looking for PDF viewer link on: {article_url}")
     
     try:
-        # Step 1: Find the link to the PDF viewer page on the main article page
-        response = requests.get(article_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        # Step 1: Find the link to the PDF viewer page on the main article page,
+        # which carries the specific class for the PDF viewer
+        pdf_viewer_url = fetch_page_link(article_url, PDF_VIEWER_LINK_XPATH)
         
-        # Look for the link with the specific class for the PDF viewer
-        pdf_viewer_link_tag = soup.find('a', class_='obj_galley_link pdf')
-        
-        if not pdf_viewer_link_tag or not pdf_viewer_link_tag.has_attr('href'):
+        if not pdf_viewer_url:
             logger.warning("PDF viewer link not found on the article page.")
             return None
         
-        pdf_viewer_url = urllib.parse.urljoin(article_url, pdf_viewer_link_tag['href'])
         logger.info(f"Step 2: Found PDF viewer link. Now looking for download link on: {pdf_viewer_url}")
 
-        # Step 2: Navigate to the PDF viewer page and find the download link
-        response_viewer = requests.get(pdf_viewer_url, timeout=10)
-        response_viewer.raise_for_status()
-        soup_viewer = BeautifulSoup(response_viewer.text, "html.parser")
-
-        # The direct download link has a class of 'download'
-        final_download_link_tag = soup_viewer.find('a', class_='download')
+        # Step 2: Navigate to the PDF viewer page and find the download link,
+        # which has a class of 'download'
+        final_pdf_url = fetch_page_link(pdf_viewer_url, DOWNLOAD_LINK_XPATH)
 
-        if final_download_link_tag and final_download_link_tag.has_attr('href'):
-            final_pdf_url = urllib.parse.urljoin(pdf_viewer_url, final_download_link_tag['href'])
+        if final_pdf_url:
             logger.info(f"Step 3: Found final PDF download link: {final_pdf_url}")
             return final_pdf_url
         
@@ -197,6 +427,20 @@ def find_pdf_link(article_url):
         logger.exception(f"Unexpected error in find_pdf_link: {e}")
         return None
 
+def resolve_all_pdfs(results):
+    """
+    Resolves the PDF download link of every result concurrently.
+    Returns a list of (result, pdf_url) pairs in the original order.
+    """
+    logger.info(f"Resolving PDF links for {len(results)} articles")
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
+        pdf_urls = list(executor.map(find_pdf_link, [result['link'] for result in results]))
+
+    found = sum(1 for pdf_url in pdf_urls if pdf_url)
+    logger.info(f"Resolved {found} of {len(results)} PDF links")
+    return list(zip(results, pdf_urls))
+
 def download_file(url, filename):
     """
     Downloads a file from a given URL and saves it with a specified filename,
@@ -207,29 +451,35 @@ def download_file(url, filename):
     
     try:
         print(f"Downloading {filename}...")
-        response = requests.get(url, stream=True, timeout=30, allow_redirects=True)
-        response.raise_for_status()
-        
-        logger.debug(f"Download response status: {response.status_code}")
-        content_type = response.headers.get('Content-Type', '')
-        logger.debug(f"Content-Type: {content_type}")
-        
-        if 'application/pdf' not in content_type:
-            logger.warning(f"Downloaded file is not a PDF. Content-Type: {content_type}")
-            print("The downloaded file is not a PDF. Aborting.")
-            return False
-
-        with open(filename, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Only the headers are read before the Content-Type check; leaving the
+        # block drops an unread body.
+        with DOWNLOAD_SESSION.get(url, stream=True, timeout=30, allow_redirects=True) as response:
+            response.raise_for_status()
+            
+            logger.debug(f"Download response status: {response.status_code}")
+            content_type = response.headers.get('Content-Type', '')
+            logger.debug(f"Content-Type: {content_type}")
+            
+            if not PDF_CONTENT_TYPE.search(content_type):
+                logger.warning(f"Downloaded file is not a PDF. Content-Type: {content_type}")
+                print("The downloaded file is not a PDF. Aborting.")
+                return False
+
+            # Let urllib3 undo any Content-Encoding and copy in large blocks
+            response.raw.decode_content = True
+            with open(filename, 'wb', buffering=1024 * 1024) as f:
+                shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+                # Best-effort hint that the PDF won't be read back. Pages still dirty
+                # are kept until written back, so only some may be dropped now.
+                f.flush()
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                except (AttributeError, OSError):
+                    pass
         
-        if os.path.exists(filename):
-            logger.info(f"Download complete: {filename}")
-            print(f"Download complete: {filename}")
-            return True
-        else:
-            logger.error(f"File {filename} was not created after download")
-            return False
+        logger.info(f"Download complete: {filename}")
+        print(f"Download complete: {filename}")
+        return True
             
     except requests.RequestException as e:
         logger.error(f"Error downloading the file: {e}")
@@ -238,12 +488,44 @@ def download_file(url, filename):
         logger.exception(f"An error occurred during download: {e}")
         return False
 
+def download_all_pdfs(results):
+    """
+    Resolves and downloads the PDF of every result concurrently.
+    Returns the number of files that were downloaded successfully.
+    """
+    # Titles can sanitise to the same name, so number repeats before any thread
+    # starts writing; names are compared case-insensitively for Windows and macOS
+    downloads = []
+    used_names = set()
+    for result, pdf_url in resolve_all_pdfs(results):
+        if not pdf_url:
+            continue
+        base_name = safe_filename(result['title'])
+        filename = f"{base_name}.pdf"
+        counter = 2
+        while filename.casefold() in used_names:
+            filename = f"{base_name} ({counter}).pdf"
+            counter += 1
+        used_names.add(filename.casefold())
+        downloads.append((pdf_url, filename))
+    logger.info(f"Downloading {len(downloads)} PDFs")
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
+        outcomes = list(executor.map(lambda download: download_file(*download), downloads))
+
+    downloaded = sum(outcomes)
+    logger.info(f"Downloaded {downloaded} of {len(downloads)} PDFs")
+    return downloaded
+
 if __name__ == "__main__":
+    log_handler = setup_logging()
     logger.info("=" * 50)
     logger.info("NepJol Search Program Started")
     logger.info("=" * 50)
     
     try:
+        # Connect while the user is still typing
+        warm_up_connection()
         query = input("Enter your search term: ").strip()
         logger.info(f"User input query: '{query}'")
         
@@ -256,7 +538,7 @@ if __name__ == "__main__":
             
             if results:
                 while True:
-                    choice = input("Enter the number of the article to view/download (or 's' to save all to file, 'q' to quit): ").strip()
+                    choice = input("Enter the number of the article to view/download (or 's' to save all to file, 'p' to list all PDF links, 'd' to download all PDFs, 'q' to quit): ").strip()
                     logger.info(f"User choice: '{choice}'")
                     
                     if choice.lower() == 'q':
@@ -266,6 +548,20 @@ if __name__ == "__main__":
                         logger.info("User chose to save results to file")
                         save_to_file(results, query)
                         break
+                    elif choice.lower() == 'p':
+                        logger.info("User chose to list all PDF links")
+                        print("\nResolving PDF links for all articles...")
+                        for i, (result, pdf_url) in enumerate(resolve_all_pdfs(results), 1):
+                            print(f"{i}. {result['title']}")
+                            print(f"   PDF: {pdf_url or 'Not found'}")
+                        print()
+                        continue
+                    elif choice.lower() == 'd':
+                        logger.info("User chose to download all PDFs")
+                        print("\nResolving PDF links for all articles...")
+                        downloaded = download_all_pdfs(results)
+                        print(f"\nDownloaded {downloaded} PDF(s).")
+                        break
                     
                     try:
                         index = int(choice) - 1
@@ -282,7 +578,7 @@ if __name__ == "__main__":
                                 logger.info(f"Download choice: '{download_choice}'")
                                 
                                 if download_choice in ['y', 'yes']:
-                                    clean_title = "".join(c for c in selected_article['title'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                                    clean_title = safe_filename(selected_article['title'])
                                     filename = f"{clean_title}.pdf"
                                     logger.info(f"Attempting to download to: {filename}")
                                     success = download_file(pdf_url, filename)
@@ -297,7 +593,7 @@ if __name__ == "__main__":
                             print("Invalid number. Please try again.")
                     except ValueError:
                         logger.warning(f"Invalid input (not a number): '{choice}'")
-                        print("Invalid input. Please enter a number, 's', or 'q'.")
+                        print("Invalid input. Please enter a number, 's', 'p', 'd', or 'q'.")
             
     except Exception as e:
         logger.exception(f"Unexpected error in main program: {e}")
@@ -305,4 +601,8 @@ if __name__ == "__main__":
     
     finally:
         logger.info("Program finished")
-        print(f"\nProgram finished. Log file created: {log_filename}")
+        log_handler.flush()
+        if log_handler.target.opened:
+            print(f"\nProgram finished. Log file created: {log_handler.target.baseFilename}")
+        else:
+            print("\nProgram finished.")
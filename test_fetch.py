@@ -0,0 +1,185 @@
+import importlib
+import importlib.util
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+PDF_BODY = b"%PDF-1.4\n" + b"0" * (512 * 1024)
+HTML_BODY = b"<html><body>" + b"x" * (512 * 1024) + b"</body></html>"
+ARTICLE_BODY = b'<html><body><a class="obj_galley_link pdf" href="/viewer">PDF</a></body></html>'
+VIEWER_BODY = b'<html><body><a class="download" href="/file.pdf">Download</a></body></html>'
+SEARCH_BODY = """<html><head><meta charset="utf-8"></head><body>
+<div class="obj_article_summary">
+  <h3 class="title"><a href="/index.php/njs/article/view/1">Rice   farming in <em>Nepal</em></a></h3>
+  <div class="meta"><div class="authors"> Ram Sharma,
+    Sita Thapa </div></div>
+</div>
+<div class="obj_article_summary">
+  <h3 class="title"><a href="https://example.org/2">नेपाली शीर्षक</a></h3>
+  <div class="source">Nepal Journal</div>
+</div>
+</body></html>""".encode("utf-8")
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep connections open so tests can see whether they are reused
+    protocol_version = "HTTP/1.1"
+    # Headers, and (method, client port), of every request served, newest last
+    received_headers = []
+    received_requests = []
+
+    def do_HEAD(self):
+        self.received_requests.append((self.command, self.client_address[1]))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.received_headers.append(self.headers)
+        self.received_requests.append((self.command, self.client_address[1]))
+        if self.path.endswith(".pdf"):
+            content_type, body = "application/pdf", PDF_BODY
+        elif self.path == "/article":
+            content_type, body = "text/html", ARTICLE_BODY
+        elif self.path == "/viewer":
+            content_type, body = "text/html", VIEWER_BODY
+        elif self.path.startswith("/search"):
+            content_type, body = "text/html", SEARCH_BODY
+        else:
+            content_type, body = "text/html", HTML_BODY
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def fetch(tmp_path, monkeypatch):
+    """Imports a fresh copy of the module with its cache files in a temp directory"""
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop("fetch", None)
+    module = importlib.import_module("fetch")
+    yield module
+    if module.SESSION:
+        module.SESSION.close()
+    if module.ETAG_CACHE:
+        module.ETAG_CACHE.close()
+    sys.modules.pop("fetch", None)
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_search_parses_result_blocks(fetch, server, monkeypatch):
+    monkeypatch.setattr(fetch, "SEARCH_URL", f"{server}/search")
+    monkeypatch.setattr(fetch, "BASE_URL", server)
+
+    assert fetch.search_nepjol("rice") == [
+        {
+            "title": "Rice farming in Nepal",
+            "authors": "Ram Sharma, Sita Thapa",
+            "link": f"{server}/index.php/njs/article/view/1",
+            "source": "Unknown source"
+        },
+        {
+            "title": "नेपाली शीर्षक",
+            "authors": "No authors",
+            "link": "https://example.org/2",
+            "source": "Nepal Journal"
+        }
+    ]
+
+def test_search_only_advertises_decodable_encodings(fetch, server, monkeypatch):
+    monkeypatch.setattr(fetch, "SEARCH_URL", f"{server}/search")
+    fetch.search_nepjol("rice")
+
+    advertised = [encoding.strip() for encoding in Handler.received_headers[-1]["Accept-Encoding"].split(",")]
+    assert "br" not in advertised or any(
+        importlib.util.find_spec(name) for name in ("brotli", "brotlicffi")
+    )
+    assert "gzip" in advertised
+
+def test_search_reuses_warmed_up_connection(fetch, server, monkeypatch):
+    monkeypatch.setattr(fetch, "BASE_URL", server)
+    monkeypatch.setattr(fetch, "SEARCH_URL", f"{server}/search")
+    # NepJol is https-only; route the local http server through the shared adapter too
+    fetch.DOWNLOAD_SESSION.mount("http://", fetch.HTTP_ADAPTER)
+    fetch.open_session().mount("http://", fetch.HTTP_ADAPTER)
+    Handler.received_requests.clear()
+
+    fetch.warm_up_connection().join()
+    assert fetch.search_nepjol("rice")
+
+    (head, head_port), (get, get_port) = Handler.received_requests
+    assert (head, get) == ("HEAD", "GET")
+    assert head_port == get_port
+    assert len(fetch.HTTP_ADAPTER.poolmanager.pools) == 1
+
+def test_import_creates_no_files(fetch, tmp_path):
+    assert fetch.SESSION is None
+    assert not list(tmp_path.iterdir())
+
+def test_open_session_creates_cache_on_first_use(fetch, tmp_path):
+    session = fetch.open_session()
+    assert fetch.open_session() is session
+    assert (tmp_path / "nepjol_cache.sqlite").exists()
+
+def test_import_does_not_open_etag_cache(fetch, tmp_path):
+    assert fetch.ETAG_CACHE is None
+    assert not list(tmp_path.glob("etag_cache*"))
+
+def test_find_pdf_link_stores_links_with_etags(fetch, server):
+    assert fetch.find_pdf_link(f"{server}/article") == f"{server}/file.pdf"
+    assert fetch.ETAG_CACHE[f"{server}/article"] == {"etag": '"v1"', "link": f"{server}/viewer"}
+
+def test_find_pdf_link_works_without_etag_cache(fetch, server, monkeypatch):
+    def locked(*args, **kwargs):
+        raise OSError("Resource temporarily unavailable")
+
+    monkeypatch.setattr(fetch.shelve, "open", locked)
+
+    assert fetch.find_pdf_link(f"{server}/article") == f"{server}/file.pdf"
+    assert fetch.ETAG_CACHE is False
+
+def test_download_is_not_cached(fetch, server, tmp_path):
+    assert fetch.download_file(f"{server}/article.pdf", "article.pdf")
+    assert (tmp_path / "article.pdf").read_bytes() == PDF_BODY
+    assert len(fetch.open_session().cache.responses) == 0
+
+def test_non_pdf_download_leaves_body_unread(fetch, server, tmp_path, monkeypatch):
+    responses = []
+    original_get = fetch.DOWNLOAD_SESSION.get
+
+    def recording_get(*args, **kwargs):
+        response = original_get(*args, **kwargs)
+        responses.append(response)
+        return response
+
+    monkeypatch.setattr(fetch.DOWNLOAD_SESSION, "get", recording_get)
+
+    assert not fetch.download_file(f"{server}/login", "article.pdf")
+    assert not (tmp_path / "article.pdf").exists()
+    assert responses[0].raw.tell() == 0
+    assert len(fetch.open_session().cache.responses) == 0
+
+def test_download_all_pdfs_gives_each_file_its_own_name(fetch, server, tmp_path, monkeypatch):
+    results = [{"title": title, "link": f"{server}/{i}"}
+               for i, title in enumerate(["Same: title", "Same title", "same title"])]
+    monkeypatch.setattr(fetch, "find_pdf_link", lambda link: f"{link}.pdf")
+
+    assert fetch.download_all_pdfs(results) == 3
+    assert sorted(path.name for path in tmp_path.glob("*.pdf")) == [
+        "Same title (2).pdf", "Same title.pdf", "same title (3).pdf"
+    ]